@@ -1,3 +1,4 @@
+import argparse
 import pygame
 from collections import defaultdict
 
@@ -6,10 +7,19 @@ from data.constants import WIDTH, HEIGHT
 from data.celestial_objects import get_massive_objects
 from physics.integrator import calculate_state_new
 from rendering.renderer import pygame_draw
+from recording.recorder import TrajectoryRecorder
+from recording.replay import TrajectoryReader
+from network.client import SimulationClient
+from network.protocol import parse_address
 
 
-def main():
-    """Hauptfunktion der Orbital-Simulation"""
+def main(record_path=None, replay_path=None, connect_address=None):
+    """Hauptfunktion der Orbital-Simulation
+
+    record_path: zeichnet die Simulation in dieses Verzeichnis auf
+    replay_path: spielt eine Aufzeichnung ab, ohne Physik zu rechnen
+    connect_address: zeigt die Simulation eines laufenden Servers ("host:port")
+    """
     # initialize the pygame module
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -27,48 +37,105 @@ def main():
     time = 0
     time_step = 60
 
-    while running:
-        time += time_step
+    recorder = None
+    reader = None
+    client = None
+    clock = pygame.time.Clock()
+    if connect_address is not None:
+        client = SimulationClient(*parse_address(connect_address))
+        client.wait_ready(timeout=10)
+    elif replay_path is not None:
+        reader = TrajectoryReader(replay_path)
+        time = reader.time_start
+        time_step = reader.time_step * reader.sample_every
+    elif record_path is not None:
+        recorder = TrajectoryRecorder(record_path, list_massiveobjects, time_step)
+
+    try:
+        while running:
+            if client is not None:
+                # Thin client: Zustände vom Server übernehmen
+                clock.tick(60)
+                if client.time < time:
+                    # the server was reset, possibly by another client: drop the old trails
+                    screen.fill((0, 0, 0))
+                time = client.time
+                list_massiveobjects = client.get_massive_objects()
+            elif reader is not None:
+                # Replay: Zustände aus der Aufzeichnung lesen statt Physik zu rechnen
+                time = reader.clamp_time(time + time_step)
+                list_massiveobjects = reader.get_massive_objects(time)
+            else:
+                # Berechne neue Zustände für alle Objekte, Manöver zur Zeit am Anfang des Schritts
+                for massiveObject_1 in list_massiveobjects:
+                    state_new = calculate_state_new(massiveObject_1, list_massiveobjects, time_step, time)
+                    massiveObject_1.addState(state_new)
+                time += time_step
 
-        # Berechne neue Zustände für alle Objekte
-        for massiveObject_1 in list_massiveobjects:
-            state_new = calculate_state_new(massiveObject_1, list_massiveobjects, time_step)
-            massiveObject_1.addState(state_new)
+                if recorder is not None:
+                    recorder.record(time, list_massiveobjects)
 
-        # Event handling
-        for event in pygame.event.get():
-            # only do something if the event is of type QUIT
-            if event.type == pygame.QUIT:
-                # change the value to False, to exit the main loop
-                running = False
-            elif event.type in [pygame.KEYDOWN, pygame.KEYUP]:
-                keysPressed[event.key] = event.type == pygame.KEYDOWN
+            # Event handling
+            for event in pygame.event.get():
+                # only do something if the event is of type QUIT
+                if event.type == pygame.QUIT:
+                    # change the value to False, to exit the main loop
+                    running = False
+                elif event.type in [pygame.KEYDOWN, pygame.KEYUP]:
+                    keysPressed[event.key] = event.type == pygame.KEYDOWN
+                    if client is not None and event.type == pygame.KEYDOWN:
+                        # Server steuern: Pause und Geschwindigkeit
+                        if event.key == pygame.K_SPACE:
+                            client.send_command({"command": "toggle_pause"})
+                        elif event.key == pygame.K_PAGEUP:
+                            client.send_command({"command": "speed", "value": client.speed * 2})
+                        elif event.key == pygame.K_PAGEDOWN:
+                            client.send_command({"command": "speed", "value": client.speed // 2})
 
-        # Keyboard controls
-        if keysPressed[pygame.K_DOWN]:
-            zoom /= 0.85
-            screen.fill((0, 0, 0))
-        if keysPressed[pygame.K_UP]:
-            zoom /= 1.2
-            screen.fill((0, 0, 0))
-        if keysPressed[pygame.K_ESCAPE]:
-            return False
-        if keysPressed[pygame.K_w]:
-            scroll_y += 10
-            screen.fill((0, 0, 0))
-        if keysPressed[pygame.K_s]:
-            scroll_y -= 10
-            screen.fill((0, 0, 0))
-        if keysPressed[pygame.K_a]:
-            scroll_x += 10
-            screen.fill((0, 0, 0))
-        if keysPressed[pygame.K_d]:
-            scroll_x -= 10
-            screen.fill((0, 0, 0))
+            # Keyboard controls
+            if keysPressed[pygame.K_DOWN]:
+                zoom /= 0.85
+                screen.fill((0, 0, 0))
+            if keysPressed[pygame.K_UP]:
+                zoom /= 1.2
+                screen.fill((0, 0, 0))
+            if keysPressed[pygame.K_ESCAPE]:
+                return False
+            if keysPressed[pygame.K_w]:
+                scroll_y += 10
+                screen.fill((0, 0, 0))
+            if keysPressed[pygame.K_s]:
+                scroll_y -= 10
+                screen.fill((0, 0, 0))
+            if keysPressed[pygame.K_a]:
+                scroll_x += 10
+                screen.fill((0, 0, 0))
+            if keysPressed[pygame.K_d]:
+                scroll_x -= 10
+                screen.fill((0, 0, 0))
+            # Replay: einen Tag vor- bzw. zurückspringen
+            if reader is not None and keysPressed[pygame.K_LEFT]:
+                time = reader.clamp_time(time - 86400)
+                screen.fill((0, 0, 0))
+            if reader is not None and keysPressed[pygame.K_RIGHT]:
+                time = reader.clamp_time(time + 86400)
+                screen.fill((0, 0, 0))
 
-        # Rendering
-        pygame_draw(list_massiveobjects, screen, zoom, scroll_x, scroll_y, time)
+            # Rendering
+            pygame_draw(list_massiveobjects, screen, zoom, scroll_x, scroll_y, time)
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if reader is not None:
+            reader.close()
+        if client is not None:
+            client.close()
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Orbital, a N-Body Gravitation simulator")
+    parser.add_argument("--record", metavar="DIR", help="record the simulation into DIR")
+    parser.add_argument("--replay", metavar="DIR", help="replay a recording from DIR without physics")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="attach to a running main_server.py")
+    args = parser.parse_args()
+    main(record_path=args.record, replay_path=args.replay, connect_address=args.connect)
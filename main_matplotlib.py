@@ -1,3 +1,4 @@
+import argparse
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import numpy as np
@@ -7,12 +8,16 @@ from collections import deque
 from data.constants import WIDTH, HEIGHT
 from data.celestial_objects import get_massive_objects
 from physics.integrator import calculate_state_new
+from recording.recorder import TrajectoryRecorder
+from recording.replay import TrajectoryReader
+from network.client import SimulationClient
+from network.protocol import parse_address
 
 
 class OrbitVisualizer:
     """Pure matplotlib-based orbital simulation with adaptive time steps"""
     
-    def __init__(self):
+    def __init__(self, record_path=None, replay_path=None, connect_address=None):
         # Simulation parameters
         self.time = 0
         self.physics_timestep = 60  # Constant at 60s for accuracy
@@ -27,6 +32,23 @@ class OrbitVisualizer:
         # Initialize celestial bodies
         self.massive_objects = get_massive_objects()
         
+        # Optional recording of the run, replay of a recorded run or thin client of a server
+        self.recorder = None
+        self.reader = None
+        self.client = None
+        if connect_address is not None:
+            self.client = SimulationClient(*parse_address(connect_address))
+            self.client.wait_ready(timeout=10)
+            self.physics_timestep = self.client.time_step
+            self.massive_objects = self.client.get_massive_objects()
+        elif replay_path is not None:
+            self.reader = TrajectoryReader(replay_path)
+            self.physics_timestep = self.reader.time_step * self.reader.sample_every
+            self.time = self.reader.time_start
+            self.massive_objects = self.reader.get_massive_objects(self.time)
+        elif record_path is not None:
+            self.recorder = TrajectoryRecorder(record_path, self.massive_objects, self.physics_timestep)
+        
         # Store orbital trails for each object
         self.trails = {}
         # Additional trail buffers for intelligent sampling
@@ -124,6 +146,8 @@ class OrbitVisualizer:
         
     def on_key_press(self, event):
         """Keyboard event handler"""
+        if self.client is not None and self.send_remote_command(event.key):
+            return
         if event.key == ' ':  # Space bar
             self.toggle_pause()
         elif event.key == '+' or event.key == '=':
@@ -144,7 +168,28 @@ class OrbitVisualizer:
             self.reset_simulation()
         elif event.key == 'z':
             self.reset_zoom()
+        elif event.key == 'left' and self.reader is not None:
+            self.seek_replay(-86400)
+        elif event.key == 'right' and self.reader is not None:
+            self.seek_replay(86400)
             
+    def send_remote_command(self, key):
+        """Forward simulation controls to the server; returns True if the key was handled"""
+        if key == ' ':
+            self.client.send_command({"command": "toggle_pause"})
+        elif key == 'up':
+            self.client.send_command({"command": "speed", "value": self.simulation_speed * 2})
+        elif key == 'down':
+            self.client.send_command({"command": "speed", "value": self.simulation_speed // 2})
+        elif key == 'o':
+            self.client.send_command({"command": "focus", "index": self.focus_index + 1})
+        elif key == 'r':
+            # trails are cleared in advance_remote once the reset arrives
+            self.client.send_command({"command": "reset"})
+        else:
+            return False
+        return True
+        
     def zoom_in(self):
         """Zoom in"""
         self.zoom *= 1.5
@@ -171,10 +216,18 @@ class OrbitVisualizer:
         
     def reset_simulation(self):
         """Reset simulation"""
+        if self.recorder is not None:
+            # a restarted run would be appended to the timeline of the recorded one
+            print("Reset is disabled while recording")
+            return
         self.time = 0
         self.simulation_speed = 1
         self.zoom = 10**-6 * (1.5**25)  # Default zoom
-        self.massive_objects = get_massive_objects()
+        if self.reader is not None:
+            self.time = self.reader.time_start
+            self.massive_objects = self.reader.get_massive_objects(self.time)
+        else:
+            self.massive_objects = get_massive_objects()
         for obj in self.massive_objects:
             self.trails[obj.name].clear()
             self.trail_buffers[obj.name].clear()
@@ -251,28 +304,88 @@ class OrbitVisualizer:
                     self.trails[obj_name].append(position)
                 self.trail_buffers[obj_name].clear()
         
-    def update_animation(self, frame):
-        """Animation update for matplotlib"""
-        if self.paused:
-            return list(self.planet_plots.values()) + list(self.trail_plots.values())
-            
+    def goto_replay_time(self, time):
+        """Show the recorded state at the given time"""
+        self.time = self.reader.clamp_time(time)
+        self.massive_objects = self.reader.get_massive_objects(self.time)
+        self.load_replay_trails()
+        
+    def seek_replay(self, delta_time):
+        """Jump forward or backward in a replayed recording"""
+        self.goto_replay_time(self.time + delta_time)
+        print(f"Replay at day {self.time / (24 * 3600):.1f}")
+        
+    def load_replay_trails(self):
+        """Fill orbital trails with the recorded positions before the current time"""
+        time_start = self.time - self.trail_length * self.physics_timestep
+        _, locations = self.reader.get_locations_between(time_start, self.time)
+        for i, obj in enumerate(self.massive_objects):
+            self.trails[obj.name].clear()
+            self.trails[obj.name].extend((pos[0], pos[1]) for pos in locations[:, i])
+        
+    def advance_replay(self):
+        """Advance a replayed recording without running physics"""
+        self.goto_replay_time(self.time + self.simulation_speed * self.physics_timestep)
+        
+    def advance_remote(self):
+        """Take over the latest state received from the server"""
+        time_previous = self.time
+        self.time = self.client.time
+        self.paused = self.client.paused
+        self.simulation_speed = self.client.speed
+        self.focus_index = self.client.focus_index
+        self.massive_objects = self.client.get_massive_objects()
+        if self.time < time_previous:
+            # the server was reset, possibly by another client
+            for massive_object in self.massive_objects:
+                self.trails[massive_object.name].clear()
+                self.trail_buffers[massive_object.name].clear()
+        if self.time == time_previous:
+            return
+        for massive_object in self.massive_objects:
+            current_state = massive_object.getLatestState()
+            position = (current_state.vec_location[0], current_state.vec_location[1])
+            self.update_trail_intelligent(massive_object.name, position)
+        
+    def advance_simulation(self):
+        """Run the physics steps of one animation frame"""
         # Multiple physics steps per frame for acceleration
         for step in range(self.simulation_speed):
-            self.time += self.physics_timestep
-            
-            # Physics simulation with constant 60s steps
+            # Physics simulation with constant 60s steps, maneuvers at the time the step starts
             for massive_object in self.massive_objects:
-                state_new = calculate_state_new(massive_object, self.massive_objects, self.physics_timestep)
+                state_new = calculate_state_new(massive_object, self.massive_objects, self.physics_timestep,
+                                                self.time)
                 massive_object.addState(state_new)
                 
                 # Add position to orbital trail - ALL steps for accuracy
                 current_state = massive_object.getLatestState()
                 position = (current_state.vec_location[0], current_state.vec_location[1])
                 self.update_trail_intelligent(massive_object.name, position)
+            self.time += self.physics_timestep
+            
+            if self.recorder is not None:
+                self.recorder.record(self.time, self.massive_objects)
+        
+    def update_animation(self, frame):
+        """Animation update for matplotlib"""
+        # States come from the server, a recording or the local physics;
+        # a remote simulation is paused on the server, so keep polling it
+        if self.client is not None:
+            self.advance_remote()
+        elif self.paused:
+            return list(self.planet_plots.values()) + list(self.trail_plots.values())
+        elif self.reader is not None:
+            self.advance_replay()
+        else:
+            self.advance_simulation()
         
         # Process all remaining buffer points
         self.flush_trail_buffers()
         
+        return self.update_plot()
+    
+    def update_plot(self):
+        """Draw the current state with focus, zoom and trails"""
         # Focus object for camera positioning
         focus_obj = self.get_focus_object()
         focus_state = focus_obj.getLatestState()
@@ -399,9 +512,16 @@ class OrbitVisualizer:
         )
         
         plt.show()
+        
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.reader is not None:
+            self.reader.close()
+        if self.client is not None:
+            self.client.close()
 
 
-def main():
+def main(record_path=None, replay_path=None, connect_address=None):
     """Main function for matplotlib version"""
     print("=" * 60)
     print("🚀 ORBITAL SIMULATION - ADAPTIVE TIME STEPS")
@@ -424,6 +544,7 @@ def main():
     print("  o         - Switch Focus")
     print("  ↑/↓       - Speed (steps/frame)")
     print("  r         - Reset Simulation")
+    print("  ←/→       - Seek one day (replay only)")
     print()
     print("📡 OBJECTS:")
     
@@ -435,9 +556,15 @@ def main():
     print()
     print("🌍 Starting simulation...")
     
-    visualizer = OrbitVisualizer()
+    visualizer = OrbitVisualizer(record_path=record_path, replay_path=replay_path,
+                                 connect_address=connect_address)
     visualizer.run()
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Orbital simulation with matplotlib")
+    parser.add_argument("--record", metavar="DIR", help="record the simulation into DIR")
+    parser.add_argument("--replay", metavar="DIR", help="replay a recording from DIR without physics")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="attach to a running main_server.py")
+    args = parser.parse_args()
+    main(record_path=args.record, replay_path=args.replay, connect_address=args.connect) 
\ No newline at end of file
@@ -0,0 +1,24 @@
+import argparse
+import asyncio
+
+from network.protocol import DEFAULT_HOST, DEFAULT_PORT
+from network.server import SimulationServer
+
+
+def main():
+    """Main function for the shared simulation server"""
+    parser = argparse.ArgumentParser(description="Run one simulation that several front-ends can watch and steer")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--time-step", type=int, default=60, help="physics time step in seconds")
+    args = parser.parse_args()
+
+    server = SimulationServer(args.host, args.port, time_step=args.time_step)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print("Server stopped")
+
+
+if __name__ == "__main__":
+    main()
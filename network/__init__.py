@@ -0,0 +1 @@
+# Network package 
\ No newline at end of file
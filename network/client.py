@@ -0,0 +1,100 @@
+import socket
+import threading
+import numpy as np
+from models.state import State
+from models.massive_object import MassiveObject
+from .protocol import DEFAULT_HOST, DEFAULT_PORT, encode_message, decode_message, apply_delta
+
+
+class SimulationClient:
+    """Klasse verbindet ein Front-End mit einem laufenden SimulationServer
+
+    Ein Hintergrund-Thread liest die Frames und setzt die Deltas zum
+    aktuellen Zustand zusammen; das Front-End fragt nur den neuesten ab.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, max_fps=30):
+        self.socket = socket.create_connection((host, port))
+        self.file_socket = self.socket.makefile("rb")
+        self.lock_send = threading.Lock()
+        self.lock_state = threading.Lock()
+        self.event_ready = threading.Event()
+
+        self.list_bodies = []
+        self.time_step = None
+        self.vec_states = None
+        self.time = 0
+        self.paused = False
+        self.speed = 1
+        self.focus_index = 0
+        self.connected = True
+        self.error = None
+
+        self.send_command({"command": "subscribe", "max_fps": max_fps})
+        self.thread_reader = threading.Thread(target=self._read_frames, daemon=True)
+        self.thread_reader.start()
+
+    def send_command(self, command):
+        """Sendet einen Befehl an den Server, z.B. {"command": "pause"}"""
+        with self.lock_send:
+            self.socket.sendall(encode_message(command))
+
+    def wait_ready(self, timeout=None):
+        """Wartet auf den ersten vollständigen Frame
+
+        Wirft TimeoutError nach timeout Sekunden und ConnectionError, wenn die
+        Verbindung vor dem ersten Frame endet.
+        """
+        if not self.event_ready.wait(timeout):
+            raise TimeoutError("no frame from the server within %s s" % timeout)
+        if self.vec_states is None:
+            raise ConnectionError("the server closed the connection before the first frame: %s"
+                                  % (self.error or "end of stream"))
+
+    def close(self):
+        """Schließt die Verbindung"""
+        self.socket.close()
+
+    def get_massive_objects(self):
+        """Erstellt die Himmelskörper mit dem zuletzt empfangenen Zustand"""
+        with self.lock_state:
+            vec_states = self.vec_states.copy()
+
+        list_massiveobjects = []
+        for i, body in enumerate(self.list_bodies):
+            state = State(vec_states[i, 2:4], vec_states[i, 0:2])
+            list_massiveobjects.append(MassiveObject(
+                state, body["mass"], body["radius"], tuple(body["color"]), body["name"], body["is_heavy"], []
+            ))
+        return list_massiveobjects
+
+    def _read_frames(self):
+        """Lese-Thread: liest Nachrichten, bis die Verbindung endet"""
+        try:
+            self._read_messages()
+        except (OSError, ValueError) as error:
+            self.error = error
+        finally:
+            # wake up wait_ready, which reports the missing frame
+            self.connected = False
+            self.event_ready.set()
+
+    def _read_messages(self):
+        """Verarbeitet hello- und frame-Nachrichten"""
+        for line in self.file_socket:
+            message = decode_message(line)
+            if message["type"] == "hello":
+                self.list_bodies = message["bodies"]
+                self.time_step = message["time_step"]
+            elif message["type"] == "frame":
+                with self.lock_state:
+                    if message["key"]:
+                        self.vec_states = np.array(message["states"], dtype=float)
+                    elif self.vec_states is not None:
+                        self.vec_states = apply_delta(self.vec_states, message["states"])
+                    self.time = message["time"]
+                    self.paused = message["paused"]
+                    self.speed = message["speed"]
+                    self.focus_index = message["focus"]
+                if self.vec_states is not None:
+                    self.event_ready.set()
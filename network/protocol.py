@@ -0,0 +1,38 @@
+import json
+import numpy as np
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# every n-th frame per client carries absolute states instead of deltas
+KEYFRAME_EVERY = 100
+
+# delta frames carry integer multiples of these steps for [x, y, vx, vy]:
+# 1 m and 1 mm/s, far below anything visible, and short as JSON integers
+QUANTA = np.array([1., 1., 1e-3, 1e-3])
+
+
+def encode_message(message):
+    """Kodiert eine Nachricht als eine Zeile JSON"""
+    return (json.dumps(message) + "\n").encode("utf-8")
+
+
+def decode_message(line):
+    """Dekodiert eine Zeile JSON zu einer Nachricht"""
+    return json.loads(line.decode("utf-8") if isinstance(line, bytes) else line)
+
+
+def quantize_delta(vec_states, vec_states_base):
+    """Gibt die Differenz zu vec_states_base als ganze Vielfache von QUANTA zurück"""
+    return np.rint((vec_states - vec_states_base) / QUANTA).astype(np.int64)
+
+
+def apply_delta(vec_states_base, delta):
+    """Addiert ein quantisiertes Delta; Server und Client rechnen identisch"""
+    return vec_states_base + np.asarray(delta, dtype=float) * QUANTA
+
+
+def parse_address(address):
+    """Zerlegt "host:port" bzw. "port" in (host, port)"""
+    host, _, port = address.rpartition(":")
+    return host or DEFAULT_HOST, int(port)
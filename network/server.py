@@ -0,0 +1,261 @@
+import asyncio
+import math
+import time as clock
+import numpy as np
+from data.celestial_objects import get_massive_objects
+from models.maneuver import Maneuver
+from physics.integrator import calculate_state_new
+from recording.recorder import pack_sample
+from .protocol import (DEFAULT_HOST, DEFAULT_PORT, KEYFRAME_EVERY, encode_message, decode_message,
+                       quantize_delta, apply_delta)
+
+MAX_FPS = 120
+
+
+def get_number(command, key):
+    """Gibt command[key] als endliche Zahl zurück oder wirft ValueError"""
+    if key not in command:
+        raise ValueError("missing field %r" % key)
+    value = command[key]
+    # bool is an int subclass, but never a meaningful number here
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError("field %r must be a finite number, got %r" % (key, value))
+    return value
+
+
+class Subscriber:
+    """Klasse repräsentiert einen verbundenen Client mit eigenem Frame-Puffer
+
+    Der Puffer hält nur den neuesten Frame: ist der Client zu langsam,
+    wird der ältere Frame verworfen, statt die Physik zu blockieren.
+    """
+
+    def __init__(self, writer, max_fps):
+        self.writer = writer
+        self.max_fps = min(max(float(max_fps), 1.), MAX_FPS)
+        self.queue_frames = asyncio.Queue(maxsize=1)
+        self.vec_states_base = None
+        self.frame_count = 0
+        self.frames_dropped = 0
+
+    def offer(self, frame):
+        """Legt einen Frame ab und verwirft dabei einen noch nicht gesendeten"""
+        if self.queue_frames.full():
+            self.queue_frames.get_nowait()
+            self.frames_dropped += 1
+        self.queue_frames.put_nowait(frame)
+
+    def encode(self, frame):
+        """Kodiert einen Frame als quantisiertes Delta zum Zustand, den dieser Client zuletzt rekonstruiert hat
+
+        Da das Delta gegen den rekonstruierten Zustand gebildet wird, bleibt der
+        Fehler auf ein halbes Quantum begrenzt und summiert sich nicht auf.
+        """
+        vec_states = frame["states"]
+        message = {
+            "type": "frame",
+            "time": frame["time"],
+            "paused": frame["paused"],
+            "speed": frame["speed"],
+            "focus": frame["focus"],
+        }
+        if self.vec_states_base is None or self.frame_count % KEYFRAME_EVERY == 0:
+            self.vec_states_base = vec_states.copy()
+            message["key"] = True
+            message["states"] = vec_states.tolist()
+        else:
+            delta = quantize_delta(vec_states, self.vec_states_base)
+            # same arithmetic as the client, so both bases stay identical
+            self.vec_states_base = apply_delta(self.vec_states_base, delta)
+            message["key"] = False
+            message["states"] = delta.tolist()
+        self.frame_count += 1
+        return encode_message(message)
+
+
+class SimulationServer:
+    """Klasse besitzt die Simulationsschleife und verteilt Zustände an alle Clients"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, time_step=60, tick_interval=0.05):
+        self.host = host
+        self.port = port
+        self.time_step = time_step
+        self.tick_interval = tick_interval
+        self.list_subscribers = []
+        self.list_commands = []
+        self.reset()
+
+    def reset(self):
+        """Setzt die Simulation auf den Anfangszustand zurück"""
+        self.list_massiveobjects = get_massive_objects()
+        self.time = 0
+        self.speed = 1
+        self.paused = False
+        self.focus_index = 0
+
+    def get_hello(self):
+        """Gibt die Beschreibung der Himmelskörper für neue Clients zurück"""
+        return {
+            "type": "hello",
+            "time_step": self.time_step,
+            "bodies": [{
+                "name": massiveObject.name,
+                "color": list(massiveObject.color),
+                "radius": float(massiveObject.radius),
+                "mass": float(massiveObject.mass),
+                "is_heavy": bool(massiveObject.is_heavy),
+            } for massiveObject in self.list_massiveobjects],
+        }
+
+    def get_frame(self):
+        """Gibt eine Momentaufnahme aller Zustände zurück"""
+        row = pack_sample(self.time, self.list_massiveobjects)
+        return {
+            "time": self.time,
+            "paused": self.paused,
+            "speed": self.speed,
+            "focus": self.focus_index,
+            "states": np.array(row[1:], dtype=float).reshape(-1, 4),
+        }
+
+    def step_physics(self, step_count):
+        """Berechnet step_count Zeitschritte; läuft im Executor-Thread"""
+        for _ in range(step_count):
+            # maneuvers are evaluated at the simulation time at the start of the step
+            for massiveObject_1 in self.list_massiveobjects:
+                state_new = calculate_state_new(massiveObject_1, self.list_massiveobjects, self.time_step,
+                                                time=self.time)
+                massiveObject_1.addState(state_new)
+            self.time += self.time_step
+
+        # a long-running server only needs the latest state of every object
+        for massiveObject in self.list_massiveobjects:
+            del massiveObject.listStates[:-1]
+
+    def validate_command(self, command):
+        """Prüft einen Befehl eines Clients und wirft ValueError, wenn er ungültig ist"""
+        if not isinstance(command, dict):
+            raise ValueError("command must be a JSON object")
+        name = command.get("command")
+        if name in ("pause", "resume", "toggle_pause", "reset"):
+            return
+        if name == "subscribe":
+            if "max_fps" in command:
+                get_number(command, "max_fps")
+        elif name == "speed":
+            get_number(command, "value")
+        elif name == "focus":
+            get_number(command, "index")
+        elif name == "maneuver":
+            if command.get("name") not in [massiveObject.name for massiveObject in self.list_massiveobjects]:
+                raise ValueError("unknown object %r" % command.get("name"))
+            # time_start is an absolute simulation time in s, the burn lasts time_duration s
+            time_start = get_number(command, "time_start")
+            get_number(command, "force")
+            time_duration = get_number(command, "time_duration")
+            if time_duration <= 0:
+                raise ValueError("time_duration must be positive")
+            if time_start + time_duration <= self.time:
+                raise ValueError("maneuver ends at %s, before the current time %s"
+                                 % (time_start + time_duration, self.time))
+        else:
+            raise ValueError("unknown command %r" % name)
+
+    def apply_command(self, command):
+        """Wendet einen geprüften Befehl eines Clients an"""
+        name = command.get("command")
+        if name == "pause":
+            self.paused = True
+        elif name == "resume":
+            self.paused = False
+        elif name == "toggle_pause":
+            self.paused = not self.paused
+        elif name == "speed":
+            self.speed = min(1440, max(1, int(command["value"])))
+        elif name == "focus":
+            self.focus_index = int(command["index"]) % len(self.list_massiveobjects)
+        elif name == "maneuver":
+            for massiveObject in self.list_massiveobjects:
+                if massiveObject.name == command["name"]:
+                    massiveObject.list_maneuvers.append(Maneuver(
+                        command["time_start"], command["time_duration"], command["force"]
+                    ))
+        elif name == "reset":
+            self.reset()
+
+    async def run_simulation(self):
+        """Simulationsschleife: Befehle anwenden, rechnen, Frames verteilen"""
+        loop = asyncio.get_running_loop()
+        while True:
+            time_tick = clock.monotonic()
+
+            # commands are only applied between ticks, never while physics runs
+            list_commands, self.list_commands = self.list_commands, []
+            for command in list_commands:
+                # a bad command must never stop the simulation shared by all clients
+                try:
+                    self.apply_command(command)
+                except (KeyError, TypeError, ValueError) as error:
+                    print("dropping command %r: %s" % (command, error))
+
+            if not self.paused:
+                await loop.run_in_executor(None, self.step_physics, self.speed)
+
+            frame = self.get_frame()
+            for subscriber in self.list_subscribers:
+                subscriber.offer(frame)
+
+            await asyncio.sleep(max(0., self.tick_interval - (clock.monotonic() - time_tick)))
+
+    async def send_frames(self, subscriber):
+        """Sendet die Frames eines Clients, höchstens max_fps pro Sekunde"""
+        try:
+            while True:
+                frame = await subscriber.queue_frames.get()
+                subscriber.writer.write(subscriber.encode(frame))
+                await subscriber.writer.drain()
+                await asyncio.sleep(1. / subscriber.max_fps)
+        except ConnectionError:
+            # handle_client notices the closed connection and cleans up
+            return
+
+    async def handle_client(self, reader, writer):
+        """Bearbeitet eine Client-Verbindung"""
+        subscriber = None
+        task_sender = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    command = decode_message(line)
+                    self.validate_command(command)
+                except ValueError as error:
+                    print("dropping invalid command %r: %s" % (line, error))
+                    continue
+                if command.get("command") == "subscribe":
+                    if subscriber is not None:
+                        continue
+                    writer.write(encode_message(self.get_hello()))
+                    await writer.drain()
+                    subscriber = Subscriber(writer, command.get("max_fps", 30))
+                    self.list_subscribers.append(subscriber)
+                    task_sender = asyncio.create_task(self.send_frames(subscriber))
+                else:
+                    self.list_commands.append(command)
+        except (ConnectionError, ValueError) as error:
+            print("client disconnected: %s" % error)
+        finally:
+            if subscriber is not None:
+                self.list_subscribers.remove(subscriber)
+            if task_sender is not None:
+                task_sender.cancel()
+            writer.close()
+
+    async def serve(self):
+        """Startet Server und Simulationsschleife"""
+        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        print("Orbital server listening on %s:%s" % (self.host, self.port))
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.run_simulation())
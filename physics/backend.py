@@ -0,0 +1,226 @@
+import os
+import numpy as np
+from data.constants import CONST_GRAVITY
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# runtime selection: "numpy", "numba" or "auto" (numba if installed)
+ENV_BACKEND = "ORBITAL_BACKEND"
+
+# backends are stateless, so one instance per name is shared by all callers
+_backends = {}
+
+
+class NumpyBackend:
+    """Referenz-Backend: vektorisierte Kernel mit NumPy
+
+    Alle Arrays tragen eine führende "Universum"-Dimension:
+    Positionen, Geschwindigkeiten und die Geschwindigkeitsänderung durch
+    Manöver (vec_mission) haben die Form (members, bodies, 2), Massen (members, bodies).
+    """
+
+    name = "numpy"
+
+    def get_acceleration(self, vec_location, vec_locations_others, masses, index, time_step):
+        """Berechnet die Beschleunigung eines einzelnen Objekts an vec_location, siehe get_acceleration
+
+        vec_locations_others hat die Form (bodies, 2), masses die Form (bodies,).
+        Das Objekt index (-1 für keines) wird dabei übersprungen.
+        """
+        vec_distance = vec_locations_others - vec_location
+        magnitude = np.linalg.norm(vec_distance, axis=-1)
+        if index >= 0:
+            magnitude[index] = np.inf
+
+        factor = CONST_GRAVITY * masses / magnitude**3
+        return time_step * (factor @ vec_distance)
+
+    def get_accelerations(self, vec_locations_current, vec_locations_others, masses, time_step):
+        """Berechnet die Beschleunigung aller Objekte aller Universen durch Gravitationskräfte
+
+        Wie in get_acceleration wird das jeweilige Objekt an vec_locations_current
+        ausgewertet, alle anderen an vec_locations_others.
+        """
+        # vec_distance[m, i, j] points from object i to object j in member m
+        vec_distance = vec_locations_others[:, np.newaxis, :, :] - vec_locations_current[:, :, np.newaxis, :]
+        magnitude = np.linalg.norm(vec_distance, axis=-1)
+
+        # exclude self-interaction without dividing by zero
+        body_count = magnitude.shape[1]
+        magnitude[:, np.arange(body_count), np.arange(body_count)] = np.inf
+
+        factor = CONST_GRAVITY * masses[:, np.newaxis, :] / magnitude**3
+        return time_step * np.einsum('mij,mijk->mik', factor, vec_distance)
+
+    def calculate_states_new(self, vec_locations, vec_velocities, masses, vec_mission, time_step):
+        """Berechnet die neuen Zustände aller Universen, analog zu calculate_state_new
+
+        Im Gegensatz zur Schleife in main.py werden alle Objekte gleichzeitig
+        aus demselben Ausgangszustand fortgeschrieben.
+        """
+        a = self.get_accelerations(vec_locations, vec_locations, masses, time_step)
+
+        vec_location_b = vec_locations + vec_velocities + time_step
+        vec_velocity_b = vec_velocities + a + time_step
+        b = self.get_accelerations(vec_location_b, vec_locations, masses, time_step)
+
+        vec_location_c = vec_locations + vec_velocity_b + time_step
+        vec_velocity_c = vec_velocities + b + time_step
+        c = self.get_accelerations(vec_location_c, vec_locations, masses, time_step)
+
+        vec_location_d = vec_locations + vec_velocity_c + time_step
+        d = self.get_accelerations(vec_location_d, vec_locations, masses, time_step)
+
+        vec_acceleration_new = 1/6 * (a + 2.0 * (b + c) + d)
+        vec_acceleration_new += vec_mission
+
+        vec_velocities_new = vec_velocities + vec_acceleration_new
+        vec_locations_new = vec_locations + vec_velocities_new * time_step
+
+        return vec_locations_new, vec_velocities_new
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _numba_acceleration(vec_locations_others, masses, m, i, x, y, time_step):
+        """Beschleunigung auf Objekt i in Universum m an (x, y), ohne temporäre Arrays"""
+        ax = 0.
+        ay = 0.
+        for j in range(vec_locations_others.shape[1]):
+            if j == i:
+                continue
+            dx = vec_locations_others[m, j, 0] - x
+            dy = vec_locations_others[m, j, 1] - y
+            magnitude = np.sqrt(dx * dx + dy * dy)
+            factor = CONST_GRAVITY * masses[m, j] / (magnitude * magnitude * magnitude)
+            ax += dx * factor
+            ay += dy * factor
+        return time_step * ax, time_step * ay
+
+    @numba.njit(cache=True)
+    def _numba_acceleration_body(vec_location, vec_locations_others, masses, index, time_step):
+        """Beschleunigung auf ein einzelnes Objekt index an vec_location"""
+        vec_acceleration = np.zeros(2)
+        for j in range(vec_locations_others.shape[0]):
+            if j == index:
+                continue
+            dx = vec_locations_others[j, 0] - vec_location[0]
+            dy = vec_locations_others[j, 1] - vec_location[1]
+            magnitude = np.sqrt(dx * dx + dy * dy)
+            factor = CONST_GRAVITY * masses[j] / (magnitude * magnitude * magnitude)
+            vec_acceleration[0] += dx * factor
+            vec_acceleration[1] += dy * factor
+        return time_step * vec_acceleration
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_accelerations(vec_locations_current, vec_locations_others, masses, time_step):
+        member_count, body_count = vec_locations_current.shape[0], vec_locations_current.shape[1]
+        vec_accelerations = np.empty_like(vec_locations_current)
+        for k in numba.prange(member_count * body_count):
+            m = k // body_count
+            i = k % body_count
+            ax, ay = _numba_acceleration(vec_locations_others, masses, m, i,
+                                         vec_locations_current[m, i, 0], vec_locations_current[m, i, 1],
+                                         time_step)
+            vec_accelerations[m, i, 0] = ax
+            vec_accelerations[m, i, 1] = ay
+        return vec_accelerations
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_states_new(vec_locations, vec_velocities, masses, vec_mission, time_step):
+        member_count, body_count = vec_locations.shape[0], vec_locations.shape[1]
+        vec_locations_new = np.empty_like(vec_locations)
+        vec_velocities_new = np.empty_like(vec_velocities)
+        # every (member, body) pair only reads the shared starting state, so the
+        # four stages of one pair run fused in registers and pairs run in parallel
+        for k in numba.prange(member_count * body_count):
+            m = k // body_count
+            i = k % body_count
+            x, y = vec_locations[m, i, 0], vec_locations[m, i, 1]
+            vx, vy = vec_velocities[m, i, 0], vec_velocities[m, i, 1]
+
+            ax_a, ay_a = _numba_acceleration(vec_locations, masses, m, i, x, y, time_step)
+
+            vx_b = vx + ax_a + time_step
+            vy_b = vy + ay_a + time_step
+            ax_b, ay_b = _numba_acceleration(vec_locations, masses, m, i,
+                                             x + vx + time_step, y + vy + time_step, time_step)
+
+            vx_c = vx + ax_b + time_step
+            vy_c = vy + ay_b + time_step
+            ax_c, ay_c = _numba_acceleration(vec_locations, masses, m, i,
+                                             x + vx_b + time_step, y + vy_b + time_step, time_step)
+
+            ax_d, ay_d = _numba_acceleration(vec_locations, masses, m, i,
+                                             x + vx_c + time_step, y + vy_c + time_step, time_step)
+
+            vx_new = vx + (1/6 * (ax_a + 2.0 * (ax_b + ax_c) + ax_d) + vec_mission[m, i, 0])
+            vy_new = vy + (1/6 * (ay_a + 2.0 * (ay_b + ay_c) + ay_d) + vec_mission[m, i, 1])
+            vec_velocities_new[m, i, 0] = vx_new
+            vec_velocities_new[m, i, 1] = vy_new
+            vec_locations_new[m, i, 0] = x + vx_new * time_step
+            vec_locations_new[m, i, 1] = y + vy_new * time_step
+        return vec_locations_new, vec_velocities_new
+
+
+class NumbaBackend:
+    """JIT-Backend: fusionierte, über alle Objekte parallele Kernel mit Numba"""
+
+    name = "numba"
+
+    def __init__(self):
+        if numba is None:
+            raise ImportError("the numba backend requires the numba package")
+
+    def get_acceleration(self, vec_location, vec_locations_others, masses, index, time_step):
+        """Berechnet die Beschleunigung eines einzelnen Objekts, siehe NumpyBackend"""
+        return _numba_acceleration_body(np.ascontiguousarray(vec_location, dtype=np.float64),
+                                        np.ascontiguousarray(vec_locations_others, dtype=np.float64),
+                                        np.ascontiguousarray(masses, dtype=np.float64),
+                                        index, float(time_step))
+
+    def get_accelerations(self, vec_locations_current, vec_locations_others, masses, time_step):
+        """Berechnet die Beschleunigung aller Objekte aller Universen, siehe NumpyBackend"""
+        return _numba_accelerations(np.ascontiguousarray(vec_locations_current, dtype=np.float64),
+                                    np.ascontiguousarray(vec_locations_others, dtype=np.float64),
+                                    np.ascontiguousarray(masses, dtype=np.float64),
+                                    float(time_step))
+
+    def calculate_states_new(self, vec_locations, vec_velocities, masses, vec_mission, time_step):
+        """Berechnet die neuen Zustände aller Universen, siehe NumpyBackend"""
+        return _numba_states_new(np.ascontiguousarray(vec_locations, dtype=np.float64),
+                                 np.ascontiguousarray(vec_velocities, dtype=np.float64),
+                                 np.ascontiguousarray(masses, dtype=np.float64),
+                                 np.ascontiguousarray(vec_mission, dtype=np.float64),
+                                 float(time_step))
+
+
+def get_backend(name=None):
+    """Gibt ein Backend zurück; ohne name entscheidet die Umgebungsvariable ORBITAL_BACKEND
+
+    "auto" (Standard) wählt Numba, falls installiert. Wird "numba" verlangt,
+    ist aber nicht installiert, wird auf NumPy zurückgefallen.
+    Die Instanzen werden je Name wiederverwendet.
+    """
+    if name is None:
+        name = os.environ.get(ENV_BACKEND, "auto")
+
+    if name not in _backends:
+        _backends[name] = create_backend(name)
+    return _backends[name]
+
+
+def create_backend(name):
+    """Erstellt das Backend name, siehe get_backend"""
+    if name == "numpy":
+        return NumpyBackend()
+    if name in ("numba", "auto"):
+        if numba is not None:
+            return NumbaBackend()
+        if name == "numba":
+            print("numba is not installed, falling back to the numpy backend")
+        return NumpyBackend()
+    raise ValueError("unknown backend: %s" % name)
@@ -0,0 +1,155 @@
+import numpy as np
+from .backend import get_backend
+from .mission import get_thrust_force, get_acceleration_by_thrust, get_relative_velocities
+
+
+class Ensemble:
+    """Klasse repräsentiert viele unabhängige Universen als gemeinsames Array
+
+    Alle Zustände tragen eine führende "Universum"-Dimension:
+    vec_locations und vec_velocities haben die Form (members, bodies, 2),
+    masses und thrust_scales die Form (members, bodies).
+    Die Kernel stellt ein Backend aus physics.backend bereit.
+    """
+
+    def __init__(self, list_massiveobjects, vec_locations, vec_velocities, masses, thrust_scales, backend=None):
+        self.list_massiveobjects = list_massiveobjects
+        self.names = [massiveObject.name for massiveObject in list_massiveobjects]
+        self.is_heavy = np.array([massiveObject.is_heavy for massiveObject in list_massiveobjects])
+        self.vec_locations = vec_locations
+        self.vec_velocities = vec_velocities
+        self.masses = masses
+        self.thrust_scales = thrust_scales
+        self.time = 0
+        self.backend = backend if backend is not None else get_backend()
+
+    @property
+    def member_count(self):
+        return self.vec_locations.shape[0]
+
+    @property
+    def body_count(self):
+        return self.vec_locations.shape[1]
+
+    def index_of(self, name):
+        """Gibt den Index eines Objekts anhand seines Namens zurück"""
+        return self.names.index(name)
+
+    def step(self, time_step):
+        """Berechnet den neuen Zustand aller Universen mit einem Integrationsschritt"""
+        self.vec_locations, self.vec_velocities = self.backend.calculate_states_new(
+            self.vec_locations, self.vec_velocities, self.masses,
+            self.get_mission_accelerations(time_step), time_step
+        )
+        self.time += time_step
+
+    def get_mission_accelerations(self, time_step):
+        """Gibt die Geschwindigkeitsänderung durch Manöver zur Ensemble-Zeit zurück, Form (members, bodies, 2)
+
+        Der Schub jedes Universums wird mit thrust_scales skaliert und durch
+        die Masse des jeweiligen Universums geteilt; die Flugrichtung ist
+        relativ zum dominanten Körper des jeweiligen Universums.
+        """
+        force = np.array([get_thrust_force(massiveObject, self.time)
+                          for massiveObject in self.list_massiveobjects], dtype=float)
+        vec_velocities = get_relative_velocities(self.vec_locations, self.vec_velocities, self.masses, self.is_heavy)
+        return get_acceleration_by_thrust(vec_velocities, self.thrust_scales * force, self.masses, time_step)
+
+
+def create_ensemble(list_massiveobjects, member_count,
+                    sigma_location=0., sigma_velocity=0., sigma_mass=0., sigma_thrust=0.,
+                    perturbed_names=None, seed=None, backend=None):
+    """Erstellt ein Ensemble aus gestörten Kopien der übergebenen Himmelskörper
+
+    sigma_location [m] und sigma_velocity [m/s] sind absolute Standardabweichungen,
+    sigma_mass und sigma_thrust relative. Gestört werden nur die Objekte in
+    perturbed_names, standardmäßig alle Objekte, die nicht is_heavy sind.
+    Universum 0 bleibt immer ungestört als Referenz.
+    """
+    rng = np.random.default_rng(seed)
+
+    if perturbed_names is None:
+        perturbed_names = [massiveObject.name for massiveObject in list_massiveobjects
+                           if not massiveObject.is_heavy]
+
+    vec_location = np.array([massiveObject.getLatestState().vec_location
+                             for massiveObject in list_massiveobjects], dtype=float)
+    vec_velocity = np.array([massiveObject.getLatestState().vec_velocity
+                             for massiveObject in list_massiveobjects], dtype=float)
+    mass = np.array([massiveObject.mass for massiveObject in list_massiveobjects], dtype=float)
+
+    body_count = len(list_massiveobjects)
+    vec_locations = np.repeat(vec_location[np.newaxis], member_count, axis=0)
+    vec_velocities = np.repeat(vec_velocity[np.newaxis], member_count, axis=0)
+    masses = np.repeat(mass[np.newaxis], member_count, axis=0)
+    thrust_scales = np.ones((member_count, body_count))
+
+    mask = np.array([massiveObject.name in perturbed_names for massiveObject in list_massiveobjects])
+    # member 0 stays the unperturbed reference run
+    mask = np.logical_and(mask[np.newaxis, :], np.arange(member_count)[:, np.newaxis] > 0)
+
+    vec_locations += mask[..., np.newaxis] * rng.normal(0., sigma_location, vec_locations.shape)
+    vec_velocities += mask[..., np.newaxis] * rng.normal(0., sigma_velocity, vec_velocities.shape)
+    masses *= 1. + mask * rng.normal(0., sigma_mass, masses.shape)
+    thrust_scales *= 1. + mask * rng.normal(0., sigma_thrust, thrust_scales.shape)
+
+    return Ensemble(list_massiveobjects, vec_locations, vec_velocities, masses, thrust_scales, backend)
+
+
+class EnsembleStatistics:
+    """Klasse sammelt laufende Statistiken eines Ensembles über die Zeit
+
+    Pro Aufruf von update wird nur die Momentaufnahme (Mittelwert, Kovarianz,
+    Perzentile je Objekt) gespeichert, nicht die Bahnen der einzelnen Universen.
+    """
+
+    def __init__(self, percentiles=(5, 50, 95)):
+        self.percentiles = percentiles
+        self.list_times = []
+        self.list_means = []
+        self.list_covariances = []
+        self.list_percentiles = []
+
+    def update(self, ensemble):
+        """Fügt eine Momentaufnahme der Positionen des Ensembles hinzu"""
+        vec_locations = ensemble.vec_locations
+        mean = vec_locations.mean(axis=0)
+
+        vec_deviation = vec_locations - mean
+        member_count = max(ensemble.member_count - 1, 1)
+        covariance = np.einsum('mik,mil->ikl', vec_deviation, vec_deviation) / member_count
+
+        self.list_times.append(ensemble.time)
+        self.list_means.append(mean)
+        self.list_covariances.append(covariance)
+        self.list_percentiles.append(np.percentile(vec_locations, self.percentiles, axis=0))
+
+    def get_times(self):
+        """Gibt die Zeitpunkte aller Momentaufnahmen zurück, Form (T,)"""
+        return np.array(self.list_times)
+
+    def get_means(self):
+        """Gibt die Mittelwerte der Positionen zurück, Form (T, bodies, 2)"""
+        return np.array(self.list_means)
+
+    def get_covariances(self):
+        """Gibt die Kovarianzen der Positionen zurück, Form (T, bodies, 2, 2)"""
+        return np.array(self.list_covariances)
+
+    def get_percentiles(self):
+        """Gibt die Perzentile der Positionen zurück, Form (T, percentiles, bodies, 2)"""
+        return np.array(self.list_percentiles)
+
+
+def run_ensemble(ensemble, time_step, step_count, sample_every=1, statistics=None):
+    """Schreibt das Ensemble step_count Schritte fort und sammelt dabei Statistiken"""
+    if statistics is None:
+        statistics = EnsembleStatistics()
+
+    statistics.update(ensemble)
+    for step in range(1, step_count + 1):
+        ensemble.step(time_step)
+        if step % sample_every == 0:
+            statistics.update(ensemble)
+
+    return statistics
@@ -1,10 +1,15 @@
 from models.state import State
 from models.derivative import Derivative
 from .gravity import get_acceleration
-from .mission import get_acceleration_by_mission
+from .mission import get_acceleration_by_maneuvers
 
-def calculate_state_new(massiveObject_current, list_massiveObject, time_step):
-    """Berechnet den neuen Zustand eines Objekts mit RK4-Integration"""
+def calculate_state_new(massiveObject_current, list_massiveObject, time_step, time):
+    """Berechnet den neuen Zustand eines Objekts mit RK4-Integration
+
+    time ist die Simulationszeit am Anfang des Schritts; zu ihr werden die
+    Manöver ausgewertet und prograd relativ zum dominanten Körper angewendet
+    (siehe get_acceleration_by_maneuvers).
+    """
     state_mo1_current = massiveObject_current.getLatestState()
     vec_mo1_velocity_current = state_mo1_current.vec_velocity
     vec_mo1_location_current = state_mo1_current.vec_location
@@ -18,7 +23,8 @@ def calculate_state_new(massiveObject_current, list_massiveObject, time_step):
                                     + 2.0 *(b.vec_acceleration + c.vec_acceleration)
                                     + d.vec_acceleration)
 
-    vec_mo1_acceleration_new += get_acceleration_by_mission(massiveObject_current, time_step)
+    vec_mo1_acceleration_new += get_acceleration_by_maneuvers(
+        massiveObject_current, list_massiveObject, time, time_step)
 
     vec_mo1_velocity_new = vec_mo1_velocity_current + vec_mo1_acceleration_new
 
@@ -1,18 +1,75 @@
-def get_acceleration_by_mission(massive_object, time_step):
-    """Fügt Beschleunigung durch Missionsdaten hinzu"""
-    force_extra = 0.0
+import numpy as np
 
-    list_maneuvers = massive_object.list_maneuvers
 
-    if massive_object.name == "Chandrayaan-2":
-        test = 1
+def get_thrust_force(massive_object, time):
+    """Summe der Schubkräfte [N] aller Manöver, die zur Simulationszeit time aktiv sind
 
-    if len(list_maneuvers) > 0:
-        test = 1
+    Ein Manöver ist aktiv für time_start <= time < time_start + time_duration.
+    """
+    force = 0.0
+    for maneuver in massive_object.list_maneuvers:
+        if maneuver.time_start <= time < maneuver.time_start + maneuver.time_duration:
+            force += maneuver.force
+    return force
 
-        for maneuver in list_maneuvers:
-            if time_step > maneuver.time_start and time_step < maneuver.time_duration:
-                force_extra += maneuver.force
-                print("adding extra force: %s", force_extra)
 
-    return force_extra 
\ No newline at end of file
+def get_dominant_indices(vec_locations, masses, is_heavy):
+    """Index des schweren Körpers mit der stärksten Anziehung (m/d²) auf jedes Objekt
+
+    vec_locations hat die Form (..., bodies, 2), masses (..., bodies),
+    is_heavy (bodies,). Gibt die Form (..., bodies) zurück, -1 wenn es
+    keinen anderen schweren Körper gibt.
+    """
+    # vec_distance[..., i, j] points from object i to object j
+    vec_distance = vec_locations[..., np.newaxis, :, :] - vec_locations[..., :, np.newaxis, :]
+    distance_squared = np.sum(vec_distance**2, axis=-1)
+
+    body_count = len(is_heavy)
+    is_candidate = np.logical_and(np.asarray(is_heavy, dtype=bool)[np.newaxis, :], ~np.eye(body_count, dtype=bool))
+    with np.errstate(divide="ignore"):
+        pull = np.where(is_candidate, masses[..., np.newaxis, :] / distance_squared, -np.inf)
+
+    index = np.argmax(pull, axis=-1)
+    return np.where(np.any(is_candidate, axis=-1), index, -1)
+
+
+def get_relative_velocities(vec_locations, vec_velocities, masses, is_heavy):
+    """Geschwindigkeit jedes Objekts relativ zu seinem dominanten schweren Körper, Form (..., bodies, 2)
+
+    Für ein Raumfahrzeug im Erdorbit ist das die Geschwindigkeit relativ zur
+    Erde statt der heliozentrischen, die von der Erdbahn dominiert wird.
+    """
+    index = get_dominant_indices(vec_locations, masses, is_heavy)
+    vec_velocities_dominant = np.take_along_axis(vec_velocities, np.maximum(index, 0)[..., np.newaxis], axis=-2)
+    vec_velocities_dominant = np.where((index >= 0)[..., np.newaxis], vec_velocities_dominant, 0.)
+    return vec_velocities - vec_velocities_dominant
+
+
+def get_acceleration_by_thrust(vec_velocity, force, mass, time_step):
+    """Geschwindigkeitsänderung durch Schub in Flugrichtung (prograd) während time_step
+
+    vec_velocity ist die Geschwindigkeit relativ zum dominanten Körper,
+    siehe get_relative_velocities.
+    """
+    speed = np.linalg.norm(vec_velocity, axis=-1, keepdims=True)
+    # without a flight direction there is no prograde thrust
+    vec_direction = np.divide(vec_velocity, speed, out=np.zeros_like(vec_velocity, dtype=float), where=speed > 0)
+    return (time_step * np.asarray(force) / np.asarray(mass))[..., np.newaxis] * vec_direction
+
+
+def get_acceleration_by_maneuvers(massive_object, list_massiveobjects, time, time_step):
+    """Geschwindigkeitsänderung eines Objekts durch alle zur Simulationszeit time aktiven Manöver"""
+    force = get_thrust_force(massive_object, time)
+    if force == 0:
+        return np.zeros(2)
+
+    vec_locations = np.array([massiveObject.getLatestState().vec_location
+                              for massiveObject in list_massiveobjects], dtype=float)
+    vec_velocities = np.array([massiveObject.getLatestState().vec_velocity
+                               for massiveObject in list_massiveobjects], dtype=float)
+    masses = np.array([massiveObject.mass for massiveObject in list_massiveobjects], dtype=float)
+    is_heavy = np.array([massiveObject.is_heavy for massiveObject in list_massiveobjects])
+    index = next(i for i, massiveObject in enumerate(list_massiveobjects) if massiveObject == massive_object)
+
+    vec_velocity = get_relative_velocities(vec_locations, vec_velocities, masses, is_heavy)[index]
+    return get_acceleration_by_thrust(vec_velocity, force, massive_object.mass, time_step)
@@ -0,0 +1,336 @@
+import math
+import numpy as np
+from data.constants import CONST_GRAVITY
+from models.state import State
+from models.massive_object import MassiveObject
+
+
+def stumpff_c(z):
+    """Stumpff-Funktion C(z)"""
+    if z > 1e-8:
+        return (1 - math.cos(math.sqrt(z))) / z
+    if z < -1e-8:
+        return (math.cosh(math.sqrt(-z)) - 1) / -z
+    return 1 / 2 - z / 24
+
+
+def stumpff_s(z):
+    """Stumpff-Funktion S(z)"""
+    if z > 1e-8:
+        sqrt_z = math.sqrt(z)
+        return (sqrt_z - math.sin(sqrt_z)) / sqrt_z**3
+    if z < -1e-8:
+        sqrt_z = math.sqrt(-z)
+        return (math.sinh(sqrt_z) - sqrt_z) / sqrt_z**3
+    return 1 / 6 - z / 120
+
+
+def propagate_kepler(vec_location, vec_velocity, mu, dt, tolerance=1e-10, max_iterations=100):
+    """Propagiert einen Zustand analytisch auf einem Kegelschnitt um dt (universelle Variable)
+
+    Funktioniert für Ellipsen, Parabeln und Hyperbeln. Gibt relative
+    Position und Geschwindigkeit nach dt zurück.
+    """
+    if dt == 0:
+        return vec_location.copy(), vec_velocity.copy()
+
+    sqrt_mu = math.sqrt(mu)
+    r0 = np.linalg.norm(vec_location)
+    v0 = np.linalg.norm(vec_velocity)
+    vr0 = np.dot(vec_location, vec_velocity) / r0
+    alpha = 2 / r0 - v0**2 / mu
+
+    if alpha > 1e-12:
+        # ellipse: whole revolutions do not change the state
+        period = 2 * math.pi / (sqrt_mu * alpha**1.5)
+        dt = math.fmod(dt, period)
+        chi = sqrt_mu * alpha * dt
+    elif alpha < -1e-12:
+        a = 1 / alpha
+        sign = math.copysign(1., dt)
+        chi = sign * math.sqrt(-a) * math.log(
+            (-2 * mu * alpha * dt)
+            / (np.dot(vec_location, vec_velocity) + sign * math.sqrt(-mu * a) * (1 - r0 * alpha)))
+    else:
+        chi = sqrt_mu * dt / r0
+
+    for _ in range(max_iterations):
+        z = alpha * chi**2
+        c = stumpff_c(z)
+        s = stumpff_s(z)
+        f_chi = (r0 * vr0 / sqrt_mu * chi**2 * c + (1 - alpha * r0) * chi**3 * s
+                 + r0 * chi - sqrt_mu * dt)
+        df_chi = (r0 * vr0 / sqrt_mu * chi * (1 - alpha * chi**2 * s)
+                  + (1 - alpha * r0) * chi**2 * c + r0)
+        step = f_chi / df_chi
+        chi -= step
+        if not math.isfinite(chi):
+            raise RuntimeError("Kepler propagation diverged (dt=%s)" % dt)
+        if abs(step) < tolerance * max(1., abs(chi)):
+            break
+    else:
+        raise RuntimeError("Kepler propagation did not converge in %d iterations (dt=%s)"
+                           % (max_iterations, dt))
+
+    z = alpha * chi**2
+    c = stumpff_c(z)
+    s = stumpff_s(z)
+    f = 1 - chi**2 / r0 * c
+    g = dt - chi**3 / sqrt_mu * s
+    vec_location_new = f * vec_location + g * vec_velocity
+    r = np.linalg.norm(vec_location_new)
+    f_dot = sqrt_mu / (r * r0) * (alpha * chi**3 * s - chi)
+    g_dot = 1 - chi**2 / r * c
+    vec_velocity_new = f_dot * vec_location + g_dot * vec_velocity
+
+    return vec_location_new, vec_velocity_new
+
+
+def find_root(function, time_low, time_high, tolerance=1e-3):
+    """Bisektion für einen Vorzeichenwechsel von function zwischen time_low und time_high"""
+    value_low = function(time_low)
+    while time_high - time_low > tolerance:
+        time_mid = 0.5 * (time_low + time_high)
+        value_mid = function(time_mid)
+        if (value_mid < 0) == (value_low < 0):
+            time_low, value_low = time_mid, value_mid
+        else:
+            time_high = time_mid
+    return time_high
+
+
+class ConicSegment:
+    """Klasse repräsentiert einen Kegelschnitt-Abschnitt um einen Zentralkörper"""
+
+    def __init__(self, central_index, time_epoch, vec_location, vec_velocity, mu):
+        self.central_index = central_index
+        self.time_epoch = time_epoch
+        self.vec_location = vec_location
+        self.vec_velocity = vec_velocity
+        self.mu = mu
+        self.time_end = None
+
+    def get_relative_state(self, time):
+        """Gibt den Zustand relativ zum Zentralkörper zur Zeit time zurück"""
+        return propagate_kepler(self.vec_location, self.vec_velocity, self.mu, time - self.time_epoch)
+
+
+class PatchedConicPropagator:
+    """Klasse propagiert ein Raumfahrzeug schnell mit Einflusssphären und Kegelschnitten
+
+    Die schweren Körper (is_heavy) bilden eine Hierarchie: jeder läuft auf
+    einem Kegelschnitt um den kleinsten schwereren Körper, in dessen
+    Einflusssphäre er liegt; der massivste Körper bewegt sich gleichförmig.
+    Das Raumfahrzeug folgt einem Kegelschnitt um den Körper, in dessen
+    Einflusssphäre es sich befindet, und wechselt an deren Grenzen.
+    Manöver werden nicht berücksichtigt.
+    """
+
+    def __init__(self, list_massiveobjects, spacecraft_name=None, time=0):
+        self.list_massiveobjects = list_massiveobjects
+        self.time_start = time
+
+        list_heavy = [massiveObject for massiveObject in list_massiveobjects if massiveObject.is_heavy]
+        self.list_heavy = sorted(list_heavy, key=lambda massiveObject: -massiveObject.mass)
+        if spacecraft_name is None:
+            spacecraft_name = next(massiveObject.name for massiveObject in list_massiveobjects
+                                   if not massiveObject.is_heavy)
+        self.spacecraft = next(massiveObject for massiveObject in list_massiveobjects
+                               if massiveObject.name == spacecraft_name)
+
+        self.build_hierarchy()
+
+        state_spacecraft = self.spacecraft.getLatestState()
+        central_index = self.find_central_body(np.asarray(state_spacecraft.vec_location, dtype=float), time)
+        self.list_segments = [self.create_segment(
+            central_index, time,
+            np.asarray(state_spacecraft.vec_location, dtype=float),
+            np.asarray(state_spacecraft.vec_velocity, dtype=float)
+        )]
+        self.list_transitions = []
+
+    def build_hierarchy(self):
+        """Bestimmt Elternkörper, Einflusssphären und Anfangs-Kegelschnitte der schweren Körper"""
+        self.list_parent = [None]
+        self.list_soi_radius = [math.inf]
+        self.list_heavy_segments = [None]
+
+        root_state = self.list_heavy[0].getLatestState()
+        self.root_location = np.asarray(root_state.vec_location, dtype=float)
+        self.root_velocity = np.asarray(root_state.vec_velocity, dtype=float)
+
+        for index in range(1, len(self.list_heavy)):
+            massiveObject = self.list_heavy[index]
+            vec_location = np.asarray(massiveObject.getLatestState().vec_location, dtype=float)
+            vec_velocity = np.asarray(massiveObject.getLatestState().vec_velocity, dtype=float)
+
+            # smallest sphere of influence of a heavier body that contains this body
+            parent_index = 0
+            for candidate_index in range(index):
+                candidate_location, _ = self.get_body_state(candidate_index, self.time_start)
+                distance = np.linalg.norm(vec_location - candidate_location)
+                if (distance < self.list_soi_radius[candidate_index]
+                        and self.list_soi_radius[candidate_index] < self.list_soi_radius[parent_index]):
+                    parent_index = candidate_index
+
+            parent = self.list_heavy[parent_index]
+            parent_location, parent_velocity = self.get_body_state(parent_index, self.time_start)
+            distance = np.linalg.norm(vec_location - parent_location)
+
+            self.list_parent.append(parent_index)
+            self.list_soi_radius.append(distance * (massiveObject.mass / parent.mass) ** (2 / 5))
+            self.list_heavy_segments.append(ConicSegment(
+                parent_index, self.time_start,
+                vec_location - parent_location, vec_velocity - parent_velocity,
+                CONST_GRAVITY * (parent.mass + massiveObject.mass)
+            ))
+
+    def get_body_state(self, index, time):
+        """Gibt Position und Geschwindigkeit des schweren Körpers index zur Zeit time zurück"""
+        if index == 0:
+            return self.root_location + self.root_velocity * (time - self.time_start), self.root_velocity
+        segment = self.list_heavy_segments[index]
+        parent_location, parent_velocity = self.get_body_state(segment.central_index, time)
+        vec_location, vec_velocity = segment.get_relative_state(time)
+        return parent_location + vec_location, parent_velocity + vec_velocity
+
+    def find_central_body(self, vec_location, time):
+        """Gibt den Index des Körpers mit der kleinsten Einflusssphäre zurück, die vec_location enthält"""
+        central_index = 0
+        for index in range(1, len(self.list_heavy)):
+            body_location, _ = self.get_body_state(index, time)
+            if (np.linalg.norm(vec_location - body_location) < self.list_soi_radius[index]
+                    and self.list_soi_radius[index] < self.list_soi_radius[central_index]):
+                central_index = index
+        return central_index
+
+    def create_segment(self, central_index, time, vec_location, vec_velocity):
+        """Erstellt einen Kegelschnitt um central_index aus einem absoluten Zustand"""
+        body_location, body_velocity = self.get_body_state(central_index, time)
+        mu = CONST_GRAVITY * (self.list_heavy[central_index].mass + self.spacecraft.mass)
+        return ConicSegment(central_index, time, vec_location - body_location, vec_velocity - body_velocity, mu)
+
+    def get_spacecraft_state(self, time, segment=None):
+        """Gibt die absolute Position und Geschwindigkeit des Raumfahrzeugs zur Zeit time zurück
+
+        Liegt time hinter dem bisher propagierten Bereich, wird zuerst bis
+        time propagiert, damit keine SOI-Übergänge übersprungen werden.
+        """
+        if segment is None:
+            self.ensure_propagated(time)
+            segment = self.get_segment(time)
+        body_location, body_velocity = self.get_body_state(segment.central_index, time)
+        vec_location, vec_velocity = segment.get_relative_state(time)
+        return body_location + vec_location, body_velocity + vec_velocity
+
+    def ensure_propagated(self, time):
+        """Propagiert bis time, falls time hinter dem Ende des letzten Abschnitts liegt"""
+        segment = self.list_segments[-1]
+        time_last = segment.time_epoch if segment.time_end is None else segment.time_end
+        if time > time_last:
+            self.propagate(time)
+
+    def get_segment(self, time):
+        """Gibt den Abschnitt zurück, der die Zeit time enthält"""
+        for segment in self.list_segments:
+            if segment.time_end is None or time <= segment.time_end:
+                return segment
+        return self.list_segments[-1]
+
+    def get_soi_margins(self, segment, time):
+        """Abstände zu allen relevanten SOI-Grenzen (negativ = Grenze überschritten) und Relativgeschwindigkeiten"""
+        vec_location, vec_velocity = self.get_spacecraft_state(time, segment)
+        list_margins = []
+        list_speeds = []
+        for index in range(1, len(self.list_heavy)):
+            is_current = index == segment.central_index
+            if not is_current and self.list_parent[index] != segment.central_index:
+                continue
+            body_location, body_velocity = self.get_body_state(index, time)
+            distance = np.linalg.norm(vec_location - body_location)
+            # leaving the current sphere or entering the sphere of a child body
+            margin = self.list_soi_radius[index] - distance if is_current else distance - self.list_soi_radius[index]
+            list_margins.append(margin)
+            list_speeds.append(np.linalg.norm(vec_velocity - body_velocity))
+        return list_margins, list_speeds
+
+    def propagate(self, time_end, min_step=60., tolerance=1e-3):
+        """Propagiert bis time_end und wechselt den Kegelschnitt an jeder SOI-Grenze
+
+        Gibt die neu gefundenen Übergänge als Liste (Zeit, von, nach) zurück.
+        """
+        list_transitions = []
+        segment = self.list_segments[-1]
+        time = segment.time_epoch if segment.time_end is None else segment.time_end
+
+        while time < time_end:
+            list_margins, list_speeds = self.get_soi_margins(segment, time)
+
+            # step so that no boundary can be reached within it at the current relative speed
+            step = time_end - time
+            for margin, speed in zip(list_margins, list_speeds):
+                if speed > 0:
+                    step = min(step, max(min_step, 0.5 * margin / speed))
+            time_next = min(time + step, time_end)
+
+            margins_next, _ = self.get_soi_margins(segment, time_next)
+            crossed = [i for i, margin in enumerate(margins_next) if margin < 0]
+            if not crossed:
+                time = time_next
+                continue
+
+            def get_margin(time_probe):
+                margins, _ = self.get_soi_margins(segment, time_probe)
+                return min(margins)
+
+            time_cross = find_root(get_margin, time, time_next, tolerance)
+            vec_location, vec_velocity = self.get_spacecraft_state(time_cross, segment)
+            segment.time_end = time_cross
+
+            central_index = self.find_central_body(vec_location, time_cross)
+            if central_index == segment.central_index:
+                # numerically still on the boundary: leave towards the parent or child
+                central_index = self.find_central_body(
+                    vec_location + vec_velocity * tolerance, time_cross + tolerance)
+
+            transition = (float(time_cross),
+                          self.list_heavy[segment.central_index].name,
+                          self.list_heavy[central_index].name)
+            list_transitions.append(transition)
+
+            segment = self.create_segment(central_index, time_cross, vec_location, vec_velocity)
+            self.list_segments.append(segment)
+            time = time_cross
+
+        segment.time_end = time_end
+        self.list_transitions.extend(list_transitions)
+        return list_transitions
+
+    def sample(self, times):
+        """Gibt die Positionen des Raumfahrzeugs zu den Zeiten times zurück, Form (len(times), 2)"""
+        if len(times):
+            self.ensure_propagated(max(times))
+        return np.array([self.get_spacecraft_state(time)[0] for time in times])
+
+    def get_massive_objects(self, time):
+        """Erstellt alle Himmelskörper mit ihrem Zustand zur Zeit time für den vollen Integrator"""
+        list_massiveobjects = []
+        for massiveObject in self.list_massiveobjects:
+            if massiveObject is self.spacecraft:
+                vec_location, vec_velocity = self.get_spacecraft_state(time)
+            elif massiveObject.is_heavy:
+                vec_location, vec_velocity = self.get_body_state(self.list_heavy.index(massiveObject), time)
+            else:
+                # other light objects are not propagated by this mode
+                state = massiveObject.getLatestState()
+                vec_location, vec_velocity = state.vec_location, state.vec_velocity
+            list_massiveobjects.append(MassiveObject(
+                State(vec_velocity, vec_location),
+                massiveObject.mass,
+                massiveObject.radius,
+                massiveObject.color,
+                massiveObject.name,
+                massiveObject.is_heavy,
+                list(massiveObject.list_maneuvers)
+            ))
+        return list_massiveobjects
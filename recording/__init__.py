@@ -0,0 +1 @@
+# Recording package 
\ No newline at end of file
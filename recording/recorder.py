@@ -0,0 +1,135 @@
+import json
+import os
+import queue
+import threading
+import zlib
+import numpy as np
+
+FILENAME_META = "meta.json"
+FILENAME_INDEX = "index.jsonl"
+FILENAME_DATA = "trajectory.bin"
+
+# values per body and sample: x, y, vx, vy
+VALUES_PER_BODY = 4
+
+
+def pack_sample(time, list_massiveobjects):
+    """Packt Zeit und Zustände aller Objekte in eine Zeile [time, x, y, vx, vy, ...]"""
+    row = [time]
+    for massiveObject in list_massiveobjects:
+        state_latest = massiveObject.getLatestState()
+        row.extend(state_latest.vec_location[:2])
+        row.extend(state_latest.vec_velocity[:2])
+    return row
+
+
+class TrajectoryRecorder:
+    """Klasse schreibt abgetastete Zustände in komprimierten Blöcken auf die Festplatte
+
+    Die Simulationsschleife sammelt nur Zeilen; Komprimieren und Schreiben
+    übernimmt ein Hintergrund-Thread, damit die Physik nicht blockiert wird.
+    """
+
+    def __init__(self, path, list_massiveobjects, time_step, sample_every=1, chunk_size=1000):
+        self.path = path
+        self.sample_every = sample_every
+        self.chunk_size = chunk_size
+        self.body_count = len(list_massiveobjects)
+        self.list_rows = []
+        self.call_count = 0
+        self.time_last = None
+
+        os.makedirs(path, exist_ok=True)
+        meta = {
+            "names": [massiveObject.name for massiveObject in list_massiveobjects],
+            "colors": [list(massiveObject.color) for massiveObject in list_massiveobjects],
+            "radii": [float(massiveObject.radius) for massiveObject in list_massiveobjects],
+            "masses": [float(massiveObject.mass) for massiveObject in list_massiveobjects],
+            "is_heavy": [bool(massiveObject.is_heavy) for massiveObject in list_massiveobjects],
+            "time_step": time_step,
+            "sample_every": sample_every,
+        }
+        with open(os.path.join(path, FILENAME_META), "w") as file_meta:
+            json.dump(meta, file_meta, indent=2)
+
+        self.file_data = open(os.path.join(path, FILENAME_DATA), "wb")
+        self.file_index = open(os.path.join(path, FILENAME_INDEX), "w")
+        self.offset = 0
+        self.error_writer = None
+
+        self.queue_chunks = queue.Queue(maxsize=16)
+        self.thread_writer = threading.Thread(target=self._write_chunks, daemon=True)
+        self.thread_writer.start()
+
+    def record(self, time, list_massiveobjects):
+        """Nimmt jeden sample_every-ten Zustand auf; Zeiten müssen streng steigen"""
+        # e.g. a simulation reset: appending would mix two runs in one timeline
+        if self.time_last is not None and time <= self.time_last:
+            raise ValueError("time %s is not after the last recorded time %s; "
+                             "start a new recording instead" % (time, self.time_last))
+        self.time_last = time
+
+        self.call_count += 1
+        if (self.call_count - 1) % self.sample_every != 0:
+            return
+
+        self.list_rows.append(pack_sample(time, list_massiveobjects))
+        if len(self.list_rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Übergibt die gesammelten Zeilen als Block an den Schreib-Thread"""
+        self.raise_writer_error()
+        if not self.list_rows:
+            return
+        chunk = np.array(self.list_rows, dtype=np.float64)
+        self.list_rows = []
+        self.queue_chunks.put(chunk)
+
+    def close(self):
+        """Schreibt alle ausstehenden Blöcke und schließt die Dateien"""
+        try:
+            self.flush()
+        finally:
+            self.queue_chunks.put(None)
+            self.thread_writer.join()
+            self.file_data.close()
+            self.file_index.close()
+        self.raise_writer_error()
+
+    def raise_writer_error(self):
+        """Reicht einen Fehler des Schreib-Threads an die Simulationsschleife weiter"""
+        if self.error_writer is not None:
+            raise RuntimeError("writing the recording to %s failed" % self.path) from self.error_writer
+
+    def _write_chunks(self):
+        """Schreib-Thread: komprimiert Blöcke und ergänzt den Index"""
+        while True:
+            chunk = self.queue_chunks.get()
+            if chunk is None:
+                return
+            # after an error keep draining the queue, so put() never blocks the simulation
+            if self.error_writer is not None:
+                continue
+
+            try:
+                self._write_chunk(chunk)
+            except Exception as error:
+                self.error_writer = error
+
+    def _write_chunk(self, chunk):
+        """Komprimiert einen Block, hängt ihn an die Datendatei an und ergänzt den Index"""
+        data = zlib.compress(chunk.tobytes(), 6)
+        self.file_data.write(data)
+        self.file_data.flush()
+
+        entry = {
+            "time_start": float(chunk[0, 0]),
+            "time_end": float(chunk[-1, 0]),
+            "offset": self.offset,
+            "length": len(data),
+            "count": chunk.shape[0],
+        }
+        self.file_index.write(json.dumps(entry) + "\n")
+        self.file_index.flush()
+        self.offset += len(data)
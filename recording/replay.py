@@ -0,0 +1,115 @@
+import json
+import mmap
+import os
+import zlib
+from collections import OrderedDict
+import numpy as np
+from models.state import State
+from models.massive_object import MassiveObject
+from .recorder import FILENAME_META, FILENAME_INDEX, FILENAME_DATA, VALUES_PER_BODY
+
+
+class TrajectoryReader:
+    """Klasse liest eine aufgezeichnete Bahn per Memory-Mapping und springt zu beliebigen Zeiten
+
+    Die zuletzt entpackten cache_size Blöcke werden behalten, damit ein
+    Schweif über eine Blockgrenze nicht jedes Bild neu entpackt wird.
+    """
+
+    def __init__(self, path, cache_size=4):
+        with open(os.path.join(path, FILENAME_META)) as file_meta:
+            meta = json.load(file_meta)
+        self.names = meta["names"]
+        self.colors = [tuple(color) for color in meta["colors"]]
+        self.radii = meta["radii"]
+        self.masses = meta["masses"]
+        self.is_heavy = meta["is_heavy"]
+        self.time_step = meta["time_step"]
+        self.sample_every = meta["sample_every"]
+        self.body_count = len(self.names)
+
+        with open(os.path.join(path, FILENAME_INDEX)) as file_index:
+            list_entries = [json.loads(line) for line in file_index if line.strip()]
+        if not list_entries:
+            raise ValueError("recording at %s contains no samples" % path)
+
+        self.chunk_time_start = np.array([entry["time_start"] for entry in list_entries])
+        self.chunk_time_end = np.array([entry["time_end"] for entry in list_entries])
+        self.chunk_offset = [entry["offset"] for entry in list_entries]
+        self.chunk_length = [entry["length"] for entry in list_entries]
+        self.time_start = self.chunk_time_start[0]
+        self.time_end = self.chunk_time_end[-1]
+
+        self.file_data = open(os.path.join(path, FILENAME_DATA), "rb")
+        self.data = mmap.mmap(self.file_data.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.cache_size = max(cache_size, 1)
+        self.chunks_cached = OrderedDict()
+
+    def close(self):
+        """Gibt Memory-Map und Datei frei"""
+        self.data.close()
+        self.file_data.close()
+
+    def get_chunk(self, chunk_id):
+        """Gibt den entpackten Block chunk_id zurück, Form (count, 1 + bodies * 4)"""
+        if chunk_id in self.chunks_cached:
+            self.chunks_cached.move_to_end(chunk_id)
+            return self.chunks_cached[chunk_id]
+
+        offset = self.chunk_offset[chunk_id]
+        raw = zlib.decompress(self.data[offset:offset + self.chunk_length[chunk_id]])
+        chunk = np.frombuffer(raw, dtype=np.float64).reshape(-1, 1 + self.body_count * VALUES_PER_BODY)
+
+        # least recently used chunk goes first
+        self.chunks_cached[chunk_id] = chunk
+        if len(self.chunks_cached) > self.cache_size:
+            self.chunks_cached.popitem(last=False)
+        return chunk
+
+    def clamp_time(self, time):
+        """Begrenzt eine Zeit auf den aufgezeichneten Bereich"""
+        return min(max(time, self.time_start), self.time_end)
+
+    def get_sample(self, time):
+        """Gibt die letzte aufgezeichnete Zeile mit Zeit <= time zurück"""
+        time = self.clamp_time(time)
+        chunk_id = max(int(np.searchsorted(self.chunk_time_start, time, side="right")) - 1, 0)
+        chunk = self.get_chunk(chunk_id)
+        row_id = max(int(np.searchsorted(chunk[:, 0], time, side="right")) - 1, 0)
+        return chunk[row_id]
+
+    def get_states(self, time):
+        """Gibt Zeit, Positionen und Geschwindigkeiten zur Zeit time zurück"""
+        sample = self.get_sample(time)
+        values = sample[1:].reshape(self.body_count, VALUES_PER_BODY)
+        return sample[0], values[:, 0:2].copy(), values[:, 2:4].copy()
+
+    def get_locations_between(self, time_start, time_end):
+        """Gibt Zeiten und Positionen aller Zeilen im Intervall zurück, Form (count, bodies, 2)"""
+        chunk_first = max(int(np.searchsorted(self.chunk_time_start, time_start, side="right")) - 1, 0)
+        chunk_last = int(np.searchsorted(self.chunk_time_start, time_end, side="right"))
+
+        list_times = []
+        list_locations = []
+        for chunk_id in range(chunk_first, chunk_last):
+            chunk = self.get_chunk(chunk_id)
+            rows = chunk[(chunk[:, 0] >= time_start) & (chunk[:, 0] <= time_end)]
+            values = rows[:, 1:].reshape(-1, self.body_count, VALUES_PER_BODY)
+            list_times.append(rows[:, 0])
+            list_locations.append(values[:, :, 0:2])
+
+        if not list_times:
+            return np.empty(0), np.empty((0, self.body_count, 2))
+        return np.concatenate(list_times), np.concatenate(list_locations)
+
+    def get_massive_objects(self, time):
+        """Erstellt die Himmelskörper mit ihrem aufgezeichneten Zustand zur Zeit time"""
+        _, vec_locations, vec_velocities = self.get_states(time)
+        list_massiveobjects = []
+        for i, name in enumerate(self.names):
+            state = State(vec_velocities[i], vec_locations[i])
+            list_massiveobjects.append(MassiveObject(
+                state, self.masses[i], self.radii[i], self.colors[i], name, self.is_heavy[i], []
+            ))
+        return list_massiveobjects
@@ -0,0 +1,166 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from recording.replay import TrajectoryReader
+
+# trail length in recorded samples, as OrbitVisualizer.trail_length
+TRAIL_LENGTH = 1000
+
+
+def get_frame_times(replay_path, simulation_speed):
+    """Return the simulation time of every frame, one frame per `simulation_speed` samples"""
+    reader = TrajectoryReader(replay_path)
+    frame_step = simulation_speed * reader.time_step * reader.sample_every
+    times = []
+    time = reader.time_start
+    while time <= reader.time_end:
+        times.append(time)
+        time += frame_step
+    reader.close()
+    return times
+
+
+def split_frames(frame_count, chunk_count):
+    """Split frame indices into contiguous (first, last) ranges"""
+    chunk_size = max(1, -(-frame_count // chunk_count))
+    return [(first, min(first + chunk_size, frame_count)) for first in range(0, frame_count, chunk_size)]
+
+
+def get_frame_path(output_dir, frame_id):
+    return os.path.join(output_dir, f"frame_{frame_id:06d}.png")
+
+
+def get_segment_path(output_dir, first):
+    return os.path.join(output_dir, f"segment_{first:06d}.rgb")
+
+
+def render_matplotlib(job):
+    """Worker: render a frame range headlessly with the Agg backend and OrbitVisualizer"""
+    replay_path, output_dir, frame_times, first, zoom, focus_index, raw, dpi = job
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import numpy as np
+    from main_matplotlib import OrbitVisualizer
+
+    visualizer = OrbitVisualizer(replay_path=replay_path)
+    visualizer.zoom = zoom
+    visualizer.focus_index = focus_index
+    visualizer.fig.set_dpi(dpi)
+    frame_size = None
+
+    segment = open(get_segment_path(output_dir, first), "wb") if raw else None
+    for frame_id, time in enumerate(frame_times, start=first):
+        visualizer.goto_replay_time(time)
+        visualizer.update_plot()
+        if raw:
+            visualizer.fig.canvas.draw()
+            rgba = np.asarray(visualizer.fig.canvas.buffer_rgba())
+            frame_size = (rgba.shape[1], rgba.shape[0])
+            segment.write(np.ascontiguousarray(rgba[..., :3]).tobytes())
+        else:
+            visualizer.fig.savefig(get_frame_path(output_dir, frame_id), dpi=dpi,
+                                   facecolor=visualizer.fig.get_facecolor())
+    if segment is not None:
+        segment.close()
+    visualizer.reader.close()
+    # pooled workers run many jobs, so every job releases its figure
+    plt.close(visualizer.fig)
+    return frame_size
+
+
+def render_pygame(job):
+    """Worker: render a frame range headlessly with the dummy SDL video driver and pygame_draw_view"""
+    replay_path, output_dir, frame_times, first, zoom, focus_index, raw, dpi = job
+
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    import pygame
+    from data.constants import WIDTH, HEIGHT
+    from rendering.renderer import pygame_draw_view
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    reader = TrajectoryReader(replay_path)
+
+    trail_duration = TRAIL_LENGTH * reader.time_step * reader.sample_every
+
+    segment = open(get_segment_path(output_dir, first), "wb") if raw else None
+    for frame_id, time in enumerate(frame_times, start=first):
+        time = reader.clamp_time(time)
+        _, trails = reader.get_locations_between(time - trail_duration, time)
+        pygame_draw_view(reader.get_massive_objects(time), screen, zoom, focus_index, time, trails)
+        if raw:
+            segment.write(pygame.image.tostring(screen, "RGB"))
+        else:
+            pygame.image.save(screen, get_frame_path(output_dir, frame_id))
+    if segment is not None:
+        segment.close()
+    reader.close()
+    pygame.quit()
+    return (WIDTH, HEIGHT)
+
+
+def render_frames(replay_path, output_dir, backend="matplotlib", simulation_speed=1,
+                  zoom=None, focus_index=0, raw=False, dpi=100, workers=None):
+    """Render a recorded run to numbered PNGs or a raw RGB stream using a process pool"""
+    reader = TrajectoryReader(replay_path)
+    body_count = reader.body_count
+    reader.close()
+    if not 0 <= focus_index < body_count:
+        raise ValueError("focus index %s out of range, the recording has %s objects" % (focus_index, body_count))
+
+    os.makedirs(output_dir, exist_ok=True)
+    frame_times = get_frame_times(replay_path, simulation_speed)
+    workers = workers or os.cpu_count() or 1
+
+    render = render_pygame if backend == "pygame" else render_matplotlib
+    if zoom is None:
+        zoom = 10**-6 * (1.5**25)  # default zoom of OrbitVisualizer, both backends map it the same way
+
+    # more ranges than workers keeps the pool busy when frames differ in cost
+    ranges = split_frames(len(frame_times), workers * 4)
+    jobs = [(replay_path, output_dir, frame_times[first:last], first, zoom, focus_index, raw, dpi)
+            for first, last in ranges]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        sizes = list(executor.map(render, jobs))
+
+    if raw:
+        # concatenate the worker segments in frame order into one stream
+        with open(os.path.join(output_dir, "frames.rgb"), "wb") as stream:
+            for first, _ in ranges:
+                segment_path = get_segment_path(output_dir, first)
+                with open(segment_path, "rb") as segment:
+                    stream.write(segment.read())
+                os.remove(segment_path)
+        width, height = sizes[0]
+        print(f"Raw stream: rgb24 {width}x{height}, {len(frame_times)} frames")
+
+    return len(frame_times)
+
+
+def main():
+    """Main function for offscreen rendering"""
+    parser = argparse.ArgumentParser(description="Render a recorded run to video frames")
+    parser.add_argument("replay", metavar="DIR", help="recording made with --record")
+    parser.add_argument("output", metavar="OUT", help="directory for the frames")
+    parser.add_argument("--backend", choices=["matplotlib", "pygame"], default="matplotlib")
+    parser.add_argument("--speed", type=int, default=1, help="recorded samples per frame")
+    parser.add_argument("--zoom", type=float, default=None)
+    parser.add_argument("--focus", type=int, default=0, help="0=Sun, 1=Earth, 2=Moon, 3=Chandrayaan-2")
+    parser.add_argument("--raw", action="store_true", help="write one raw rgb24 stream instead of PNGs")
+    parser.add_argument("--dpi", type=int, default=100, help="matplotlib only")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    frame_count = render_frames(args.replay, args.output, backend=args.backend,
+                                simulation_speed=args.speed, zoom=args.zoom,
+                                focus_index=args.focus, raw=args.raw, dpi=args.dpi,
+                                workers=args.workers)
+    print(f"Rendered {frame_count} frames to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -43,4 +43,43 @@ def pygame_draw(listMassiveObjects, surface, zoom, scroll_x, scroll_y, time):
                                (calc_days_from_time(time),
                                 round(zoom, 20),
                                 time)
-                               ) 
\ No newline at end of file
+                               ) 
+
+def pygame_draw_view(listMassiveObjects, surface, zoom, focus_index, time, trails=None):
+    """Zeichnet alle Objekte zentriert auf focus_index, mit Zoom und Bahnspuren wie OrbitVisualizer
+
+    trails: optional ein Array der Form (count, objects, 2) mit früheren Positionen.
+    """
+    width, height = surface.get_size()
+    focus_state = listMassiveObjects[focus_index].getLatestState()
+    center_x = focus_state.vec_location[0]
+    center_y = focus_state.vec_location[1]
+
+    # OrbitVisualizer plots (x - center) * zoom with axis limits of +-2e8 / zoom
+    pixels_per_meter = zoom * (width / 2) / (2e8 / zoom)
+
+    def to_screen(x, y):
+        return (width / 2 + (x - center_x) * pixels_per_meter,
+                height / 2 - (y - center_y) * pixels_per_meter)
+
+    surface.fill((0, 0, 0))
+
+    if trails is not None and len(trails) > 1:
+        for currentMassiveObject_id, currentMassiveObject in enumerate(listMassiveObjects):
+            points = [to_screen(x, y) for x, y in trails[:, currentMassiveObject_id]]
+            line_width = 2 if currentMassiveObject.name in ['Earth', 'Moon'] else 1
+            pygame.draw.lines(surface, currentMassiveObject.color, False, points, line_width)
+
+    for currentMassiveObject in listMassiveObjects:
+        state_latest = currentMassiveObject.getLatestState()
+        x_converted, y_converted = to_screen(state_latest.vec_location[0], state_latest.vec_location[1])
+
+        # same marker size as OrbitVisualizer, so every object stays visible
+        marker_size = max(5, min(25, currentMassiveObject.radius / 500000))
+        pygame.draw.circle(surface, currentMassiveObject.color,
+                           (int(x_converted), int(y_converted)),
+                           max(2, int(marker_size / 2)), 0)
+
+    font = pygame.font.Font(None, 24)
+    title = "Day %s | %s" % (calc_days_from_time(time), listMassiveObjects[focus_index].name)
+    surface.blit(font.render(title, True, (255, 255, 255)), (10, 10))
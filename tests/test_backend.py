@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from data.celestial_objects import get_massive_objects
+from data.constants import CONST_GRAVITY
+from physics.backend import NumpyBackend
+from physics.ensemble import create_ensemble
+from physics.gravity import get_acceleration
+
+TIME_STEP = 60
+
+
+@pytest.fixture
+def numba_backend():
+    pytest.importorskip("numba")
+    from physics.backend import NumbaBackend
+    return NumbaBackend()
+
+
+@pytest.fixture
+def ensemble():
+    return create_ensemble(get_massive_objects(), 8, sigma_location=1000., sigma_velocity=1.,
+                           sigma_mass=0.01, seed=1, backend=NumpyBackend())
+
+
+def assert_locations_close(vec_locations_candidate, vec_locations_reference, rtol=1e-9):
+    # positions relative to the first (heaviest) body, so that 1e11 m offsets do not hide errors
+    vec_relative_candidate = vec_locations_candidate - vec_locations_candidate[..., :1, :]
+    vec_relative_reference = vec_locations_reference - vec_locations_reference[..., :1, :]
+    np.testing.assert_allclose(vec_relative_candidate, vec_relative_reference,
+                               rtol=rtol, atol=rtol * np.max(np.abs(vec_relative_reference)))
+
+
+def test_get_accelerations_backends_agree(numba_backend, ensemble):
+    # evaluate at shifted locations, as the RK stages do
+    vec_locations_current = ensemble.vec_locations + ensemble.vec_velocities * TIME_STEP
+    args = (vec_locations_current, ensemble.vec_locations, ensemble.masses, TIME_STEP)
+
+    reference = NumpyBackend().get_accelerations(*args)
+    candidate = numba_backend.get_accelerations(*args)
+
+    np.testing.assert_allclose(candidate, reference, rtol=1e-9, atol=1e-9 * np.max(np.abs(reference)))
+
+
+def test_calculate_states_new_backends_agree(numba_backend, ensemble):
+    rng = np.random.default_rng(2)
+    vec_mission = rng.normal(0., 1e-2, ensemble.vec_velocities.shape)
+    reference = NumpyBackend()
+
+    vec_locations_reference = vec_locations_candidate = ensemble.vec_locations
+    vec_velocities_reference = vec_velocities_candidate = ensemble.vec_velocities
+    for _ in range(100):
+        vec_locations_reference, vec_velocities_reference = reference.calculate_states_new(
+            vec_locations_reference, vec_velocities_reference, ensemble.masses, vec_mission, TIME_STEP)
+        vec_locations_candidate, vec_velocities_candidate = numba_backend.calculate_states_new(
+            vec_locations_candidate, vec_velocities_candidate, ensemble.masses, vec_mission, TIME_STEP)
+
+    assert_locations_close(vec_locations_candidate, vec_locations_reference)
+    np.testing.assert_allclose(vec_velocities_candidate, vec_velocities_reference, rtol=1e-9)
+
+
+def test_calculate_states_new_applies_mission(ensemble):
+    backend = NumpyBackend()
+    vec_mission = np.zeros_like(ensemble.vec_velocities)
+    vec_mission[:, -1] = [1., -2.]
+
+    _, vec_velocities_burn = backend.calculate_states_new(
+        ensemble.vec_locations, ensemble.vec_velocities, ensemble.masses, vec_mission, TIME_STEP)
+    _, vec_velocities_coast = backend.calculate_states_new(
+        ensemble.vec_locations, ensemble.vec_velocities, ensemble.masses, np.zeros_like(vec_mission), TIME_STEP)
+
+    np.testing.assert_allclose(vec_velocities_burn - vec_velocities_coast, vec_mission, atol=1e-9)
+
+
+@pytest.mark.parametrize("index", [-1, 0, 3])
+def test_get_acceleration_backends_agree(numba_backend, ensemble, index):
+    vec_location = ensemble.vec_locations[0, 3] + 1e6
+    args = (vec_location, ensemble.vec_locations[0], ensemble.masses[0], index, TIME_STEP)
+
+    reference = NumpyBackend().get_acceleration(*args)
+    candidate = numba_backend.get_acceleration(*args)
+
+    np.testing.assert_allclose(candidate, reference, rtol=1e-9)
+
+
+def test_gravity_get_acceleration_matches_pairwise_sum():
+    list_massiveobjects = get_massive_objects()
+    massiveObject_current = list_massiveobjects[1]
+    state = massiveObject_current.getLatestState()
+
+    expected = np.zeros(2)
+    for massiveObject_other in list_massiveobjects:
+        if massiveObject_other is massiveObject_current:
+            continue
+        vec_distance = massiveObject_other.getLatestState().vec_location - state.vec_location
+        expected += TIME_STEP * CONST_GRAVITY * massiveObject_other.mass * vec_distance / np.linalg.norm(vec_distance)**3
+
+    np.testing.assert_allclose(get_acceleration(massiveObject_current, state, list_massiveobjects, TIME_STEP),
+                               expected, rtol=1e-12)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from data.celestial_objects import get_massive_objects
+from physics.ensemble import create_ensemble
+from physics.mission import get_acceleration_by_maneuvers
+
+TIME_STEP = 60
+# Chandrayaan-2: Maneuver(600, 1000, 10) at 100 kg gives 10 N * 60 s / 100 kg
+DELTA_V = 6.
+
+
+def get_scene(vec_velocity_relative):
+    """Standardszene, Chandrayaan-2 mit vec_velocity_relative relativ zur Erde"""
+    list_massiveobjects = get_massive_objects()
+    earth = next(massiveObject for massiveObject in list_massiveobjects if massiveObject.name == "Earth")
+    spacecraft = next(massiveObject for massiveObject in list_massiveobjects if massiveObject.name == "Chandrayaan-2")
+    spacecraft.getLatestState().vec_velocity = earth.getLatestState().vec_velocity + np.array(vec_velocity_relative)
+    return list_massiveobjects, spacecraft
+
+
+@pytest.mark.parametrize("sign", [1., -1.])
+def test_burn_is_prograde_relative_to_earth(sign):
+    list_massiveobjects, spacecraft = get_scene([sign * 2220., 0.])
+
+    vec_delta_v = get_acceleration_by_maneuvers(spacecraft, list_massiveobjects, 600, TIME_STEP)
+
+    np.testing.assert_allclose(vec_delta_v, [sign * DELTA_V, 0.])
+
+
+@pytest.mark.parametrize("sign", [1., -1.])
+def test_ensemble_burn_is_prograde_relative_to_earth(sign):
+    list_massiveobjects, spacecraft = get_scene([sign * 2220., 0.])
+    ensemble = create_ensemble(list_massiveobjects, 4, seed=1)
+    ensemble.time = 600
+
+    vec_delta_v = ensemble.get_mission_accelerations(TIME_STEP)[:, ensemble.index_of(spacecraft.name)]
+
+    np.testing.assert_allclose(vec_delta_v, np.tile([sign * DELTA_V, 0.], (4, 1)))
+
+
+def test_no_burn_outside_maneuver_window():
+    list_massiveobjects, spacecraft = get_scene([2220., 0.])
+
+    for time in (0, 540, 1600):
+        np.testing.assert_array_equal(
+            get_acceleration_by_maneuvers(spacecraft, list_massiveobjects, time, TIME_STEP), [0., 0.])